@@ -3,12 +3,14 @@ import sys
 import argparse
 import subprocess
 from typing import Dict, Any, List, Union, Optional
-from get_params import get_parameter_mappings, validate_param
+from get_params import get_parameter_mappings, _build_validator_table, build_category_table
 
 class CVC5Solver:
     def __init__(self):
         """Initialize CVC5 solver with parameter mappings"""
         self.param_mappings = get_parameter_mappings()
+        self._validate = _build_validator_table(self.param_mappings)
+        self._param_category = build_category_table(self.param_mappings)
         self.solver_options = []
 
     def set_option(self, param: str, value: Any = None) -> None:
@@ -19,29 +21,27 @@ class CVC5Solver:
             value (Any, optional): Parameter value, not needed for boolean parameters
         """
 
+        # Single lookup instead of scanning every category
+        category = self._param_category.get(param)
+        if category is None:
+            print(f"Warning: Unknown parameter {param}")
+            return
+
         #set value to None is is not avlid
-        if validate_param(param, value, self.param_mappings) is False: 
+        validator = self._validate.get(param)
+        if validator is not None and validator(value) is False:
             print(f"Warning: Invalid value {value} for parameter {param}")
             value = None
-        
-        # Check if parameter exists in any category
-        param_found = False
-        for category, params in self.param_mappings.items():
-            if param in params:
-                param_found = True
-                if category == 'bool_params':
-                    # Boolean parameters only need the flag
-                    self.solver_options.append(f"--{param}")
-                else: 
-                    # Other parameters need both flag and value
-                    if value is not None:
-                        self.solver_options.extend([f"--{param}", str(value)])
-                    else:
-                        print(f"Warning: Value required for {param} ({category})")
-                break
-        
-        if not param_found:
-            print(f"Warning: Unknown parameter {param}")
+
+        if category == 'bool_params':
+            # Boolean parameters only need the flag
+            self.solver_options.append(f"--{param}")
+        else:
+            # Other parameters need both flag and value
+            if value is not None:
+                self.solver_options.extend([f"--{param}", str(value)])
+            else:
+                print(f"Warning: Value required for {param} ({category})")
 
     def solve_smt2_file(self, filename):
         """
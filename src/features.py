@@ -0,0 +1,76 @@
+import re
+from typing import Any, Dict, Set
+
+# Theory-specific CVC5 option prefixes. Options starting with one of these
+# prefixes are only useful when the corresponding theory shows up in the
+# instance, so they can be pruned from the search space otherwise.
+THEORY_OPTION_PREFIXES = {
+    'strings': ('strings-', 'seq-', 're-'),
+    'bitvectors': ('bv-', 'bitblast'),
+    'arithmetic': ('arith-', 'nl-'),
+    'arrays': ('arrays-',),
+    'datatypes': ('dt-', 'datatypes-'),
+    'floating_point': ('fp-',),
+    'quantifiers': ('quant-', 'cegqi-', 'cbqi-', 'sygus-', 'fmf-',
+                    'inst-', 'mbqi-', 'trigger-', 'e-matching'),
+    'separation_logic': ('sep-',),
+    'uninterpreted_functions': ('uf-',),
+}
+
+def extract_features(smt2_file: str) -> Dict[str, Any]:
+    """
+    Extracts lightweight instance features from an SMT2 file: the declared
+    logic, assertion/declaration counts and which theories appear
+    """
+    with open(smt2_file, 'r') as f:
+        content = f.read()
+
+    logic_match = re.search(r'\(set-logic\s+([A-Z_]+)\)', content)
+    logic = logic_match.group(1) if logic_match else None
+
+    features = {
+        'logic': logic,
+        'num_asserts': content.count('(assert'),
+        'num_declarations': content.count('(declare-fun')
+                            + content.count('(declare-const'),
+        'theories': _detect_theories(content, logic),
+    }
+    return features
+
+def _detect_theories(content: str, logic: str) -> Set[str]:
+    """Detects which theories an instance uses from its logic and its terms"""
+    logic = logic or ''
+    theories = set()
+
+    if 'S' in logic or 'String' in content or 'str.' in content:
+        theories.add('strings')
+    if 'BV' in logic or 'BitVec' in content or 'bv' in content:
+        theories.add('bitvectors')
+    if any(tok in logic for tok in ('IA', 'RA', 'IRA', 'N')) \
+            or 'Int' in content or 'Real' in content:
+        theories.add('arithmetic')
+    if 'A' == logic[:1] or 'Array' in content:
+        theories.add('arrays')
+    if 'DT' in logic or '(declare-datatype' in content:
+        theories.add('datatypes')
+    if 'FP' in logic or 'Float' in content or 'fp.' in content:
+        theories.add('floating_point')
+    if not logic.startswith('QF_') or 'forall' in content or 'exists' in content:
+        theories.add('quantifiers')
+    if '(declare-heap' in content or 'sep.' in content:
+        theories.add('separation_logic')
+    if 'UF' in logic or '(declare-fun' in content:
+        theories.add('uninterpreted_functions')
+
+    return theories
+
+def irrelevant_option_prefixes(features: Dict[str, Any]) -> tuple:
+    """
+    Returns the option prefixes belonging to theories the instance does not
+    use; options starting with one of these can be pruned from tuning
+    """
+    prefixes = []
+    for theory, theory_prefixes in THEORY_OPTION_PREFIXES.items():
+        if theory not in features['theories']:
+            prefixes.extend(theory_prefixes)
+    return tuple(prefixes)
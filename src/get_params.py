@@ -1,11 +1,61 @@
 from cvc5.pythonic import *
-from typing import Dict, Any, List, Union, Optional
+import functools
+import pickle
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Union, Optional
 
+# A validator takes a proposed option value and says whether it is acceptable
+Validator = Callable[[Any], bool]
+
+# On-disk cache for the parameter mappings, keyed by CVC5 version so a solver
+# upgrade invalidates it automatically
+CACHE_FILE = Path.home() / ".cache" / "cvc5_param_map.pkl"
+
+def _cache_key():
+    """Returns the cache key identifying the installed CVC5 version"""
+    try:
+        import cvc5
+        return getattr(cvc5, '__version__', None) or Solver().getVersion()
+    except Exception:
+        return None
+
+def _load_cached_mappings(key):
+    """Loads cached parameter mappings from disk, or None if missing/stale"""
+    try:
+        with open(CACHE_FILE, 'rb') as f:
+            cached = pickle.load(f)
+        if cached.get('key') == key:
+            return cached['mappings']
+    except Exception:
+        # Cache is best-effort: a corrupt or stale-format file (which can
+        # raise anything out of pickle) just means we regenerate
+        pass
+    return None
+
+def _save_cached_mappings(key, mappings):
+    """Saves parameter mappings to the on-disk cache"""
+    try:
+        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(CACHE_FILE, 'wb') as f:
+            pickle.dump({'key': key, 'mappings': mappings}, f)
+    except OSError as e:
+        print(f"Warning: could not write parameter cache: {str(e)}")
+
+@functools.lru_cache(maxsize=1)
 def get_parameter_mappings():
     """
     Creates mappings of CVC5 parameters categorized by their types.
     For numeric parameters (int and float), includes min/max bounds if available.
+    Results are cached in-process and on disk (keyed by CVC5 version), so the
+    solver is only queried for option info once per CVC5 install.
     """
+    key = _cache_key()
+    if key is not None:
+        cached = _load_cached_mappings(key)
+        if cached is not None:
+            return cached
+
     solver = Solver()
     
     param_types = {
@@ -51,78 +101,127 @@ def get_parameter_mappings():
             print(f"Error processing option {option}: {str(e)}")
             continue
     
+    if key is not None:
+        _save_cached_mappings(key, param_types)
+
     return param_types
 
 def print_param_info():
-    """Prints parameter information in a readable format"""
+    """Prints parameter information in a readable format with a single write"""
     params = get_parameter_mappings()
-    
-    print("Boolean Parameters (with defaults):")
-    print("-" * 50)
+    lines = []
+
+    lines.append("Boolean Parameters (with defaults):")
+    lines.append("-" * 50)
     for param, value in sorted(params['bool_params'].items()):
-        print(f"{param}: {value}")
-    
-    print("\nInteger Parameters (with defaults and bounds):")
-    print("-" * 50)
+        lines.append(f"{param}: {value}")
+
+    lines.append("\nInteger Parameters (with defaults and bounds):")
+    lines.append("-" * 50)
     for param, info in sorted(params['int_params'].items()):
         bounds = f"min: {info['min'] if info['min'] is not None else 'None'}, " \
                 f"max: {info['max'] if info['max'] is not None else 'None'}"
-        print(f"{param}: default={info['default']}, {bounds}")
-    
-    print("\nFloat Parameters (with defaults and bounds):")
-    print("-" * 50)
+        lines.append(f"{param}: default={info['default']}, {bounds}")
+
+    lines.append("\nFloat Parameters (with defaults and bounds):")
+    lines.append("-" * 50)
     for param, info in sorted(params['float_params'].items()):
         bounds = f"min: {info['min'] if info['min'] is not None else 'None'}, " \
                 f"max: {info['max'] if info['max'] is not None else 'None'}"
-        print(f"{param}: default={info['default']}, {bounds}")
-    
-    print("\nString Parameters (with defaults):")
-    print("-" * 50)
+        lines.append(f"{param}: default={info['default']}, {bounds}")
+
+    lines.append("\nString Parameters (with defaults):")
+    lines.append("-" * 50)
     for param, value in sorted(params['string_params'].items()):
-        print(f"{param}: {value}")
-    
-    print("\nMode Parameters (with possible values):")
-    print("-" * 50)
+        lines.append(f"{param}: {value}")
+
+    lines.append("\nMode Parameters (with possible values):")
+    lines.append("-" * 50)
     for param, values in sorted(params['mode_params'].items()):
-        print(f"{param}: {values}")
+        lines.append(f"{param}: {values}")
+
+    sys.stdout.write("\n".join(lines) + "\n")
+
+def _make_bool_validator() -> Validator:
+    def validate(value: Any) -> bool:
+        if value is None:
+            return True
+        return isinstance(value, bool)
+    return validate
+
+def _make_numeric_validator(info: Dict[str, Any], types) -> Validator:
+    # Capture bounds as locals so each call is a type check plus two compares
+    min_val = info['min']
+    max_val = info['max']
+    def validate(value: Any) -> bool:
+        if not isinstance(value, types):
+            return False
+        if min_val is not None and value < min_val:
+            return False
+        if max_val is not None and value > max_val:
+            return False
+        return True
+    return validate
+
+def _make_string_validator() -> Validator:
+    def validate(value: Any) -> bool:
+        return isinstance(value, str)
+    return validate
+
+def _make_mode_validator(modes) -> Validator:
+    # frozenset membership is O(1) vs a linear scan of the mode list
+    mode_set = frozenset(modes)
+    def validate(value: Any) -> bool:
+        return isinstance(value, str) and value in mode_set
+    return validate
+
+def _reject(value: Any) -> bool:
+    return False
+
+def _build_validator_table(param_mappings: Dict) -> Dict[str, Validator]:
+    """
+    Builds a flat {param_name: validator} table from the category mappings,
+    so validation is a single dict lookup instead of a scan over categories.
+    """
+    table = {}
+    for param in param_mappings['bool_params']:
+        table[param] = _make_bool_validator()
+    for param, info in param_mappings['int_params'].items():
+        table[param] = _make_numeric_validator(info, int)
+    for param, info in param_mappings['float_params'].items():
+        table[param] = _make_numeric_validator(info, (int, float))
+    for param in param_mappings['string_params']:
+        table[param] = _make_string_validator()
+    for param, modes in param_mappings['mode_params'].items():
+        table[param] = _make_mode_validator(modes)
+    return table
+
+def build_category_table(param_mappings: Dict) -> Dict[str, str]:
+    """
+    Builds a flat {param_name: category} table so callers can find a
+    parameter's category with one lookup instead of scanning every category
+    """
+    table = {}
+    for category, params in param_mappings.items():
+        for param in params:
+            table[param] = category
+    return table
+
+# Single-entry validator cache: holds the last mappings dict (keeping it
+# alive) and its table, verified by identity so a recycled address of a
+# garbage-collected dict can never hit a stale table
+_validator_cache = (None, None)
 
 def validate_param(param_name: str, value: Any, param_mappings: Dict) -> bool:
     """
     Validates if a parameter value is valid according to its type and bounds.
     """
-    for category, params in param_mappings.items():
-        if param_name in params:
-            if category == 'bool_params':
-                if value is None: 
-                    return True
-                return isinstance(value, bool)
-            
-            elif category == 'int_params':
-                if not isinstance(value, int):
-                    return False
-                info = params[param_name]
-                if info['min'] is not None and value < info['min']:
-                    return False
-                if info['max'] is not None and value > info['max']:
-                    return False
-                return True
-            
-            elif category == 'float_params':
-                if not isinstance(value, (int, float)):
-                    return False
-                info = params[param_name]
-                if info['min'] is not None and value < info['min']:
-                    return False
-                if info['max'] is not None and value > info['max']:
-                    return False
-                return True
-            
-            elif category == 'string_params':
-                return isinstance(value, str)
-            
-            elif category == 'mode_params':
-                return value in params[param_name]
-    return False
+    global _validator_cache
+    cached_mappings, table = _validator_cache
+    if cached_mappings is not param_mappings:
+        table = _build_validator_table(param_mappings)
+        _validator_cache = (param_mappings, table)
+    return table.get(param_name, _reject)(value)
 
 if __name__ == "__main__":
     print_param_info()
\ No newline at end of file
@@ -1,65 +1,131 @@
 from ConfigSpace import Configuration, ConfigurationSpace, Float, Integer, Categorical
+from cvc5.pythonic import Solver, parse_smt2_file, sat, unsat
 from smac import HyperparameterOptimizationFacade, Scenario
-import subprocess
+import asyncio
+import threading
 import time
 from pathlib import Path
 from typing import Dict, Any, Optional
 from get_params import get_parameter_mappings
+from features import extract_features, irrelevant_option_prefixes
 import numpy as np
 
+# Boolean parameters worth tuning; built once at module level instead of on
+# every optimizer instance
+IMPORTANT_BOOL_PARAMS = (
+    'produce-models',
+    'incremental',
+    'strings-exp',
+    'use-approx',
+    'simp-ite-compress',
+    'simplification'
+)
+
+# Use uvloop for subprocess/pipe I/O when available; the stock loop works too
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
+def _warm_worker(cpu_index: int):
+    """
+    Initializer run on each Dask worker: preload the parameter mappings and
+    pin the worker (and any cvc5 subprocesses it spawns) to its own core
+    """
+    get_parameter_mappings()
+    try:
+        import psutil
+        process = psutil.Process()
+        process.cpu_affinity([cpu_index % psutil.cpu_count()])
+    except (ImportError, AttributeError, OSError):
+        pass
+
 class CVC5Optimizer:
-    def __init__(self, smt2_file: str, timeout: int = 300):
+    def __init__(self, smt2_file: str, timeout: int = 300, in_process: bool = True,
+                 capping_slack: float = 2.0, portfolio: bool = False):
         """
         Initialize CVC5 parameter optimizer
-        
+
         Args:
             smt2_file (str): Path to SMT2 file to optimize for
             timeout (int): Maximum time (in seconds) for each CVC5 run
+            in_process (bool): Run trials through the CVC5 Python API instead
+                of spawning a cvc5 subprocess per trial
+            capping_slack (float): Adaptive capping factor; trials are aborted
+                after capping_slack times the best time seen so far, since a
+                configuration that much slower than the incumbent cannot win
+            portfolio (bool): Race each trial against default-configuration
+                CVC5 and take the first finisher, so a pathological config
+                costs at most the baseline's runtime (uses an extra core;
+                implies the subprocess trial path)
         """
         self.smt2_file = smt2_file
         self.timeout = timeout
+        self.in_process = in_process and not portfolio
+        self.portfolio = portfolio
+        self.capping_slack = capping_slack
+        self._incumbent_cost = float(timeout)
+        self._run_cache: Dict[int, float] = {}
+        self._command_cache: Dict[int, list] = {}
+        self._assertions = None  # SMT2 file parsed lazily, once per optimizer
         self.param_mappings = get_parameter_mappings()
+        self._bool_set = frozenset(self.param_mappings['bool_params'])
+        # Known defaults, used to skip options a configuration leaves unchanged
+        self._defaults: Dict[str, Any] = dict(self.param_mappings['bool_params'])
+        self._defaults.update(self.param_mappings['string_params'])
+        for category in ('int_params', 'float_params'):
+            for param, info in self.param_mappings[category].items():
+                self._defaults[param] = info['default']
+        # Prune options belonging to theories the instance does not use, so
+        # SMAC searches a much smaller space
+        try:
+            features = extract_features(smt2_file)
+            self._pruned_prefixes = irrelevant_option_prefixes(features)
+        except OSError as e:
+            print(f"Warning: could not extract features from {smt2_file}: {str(e)}")
+            self._pruned_prefixes = ()
         self.configspace = self._create_configuration_space()
 
+    def _is_relevant(self, param: str) -> bool:
+        """Checks whether a parameter survives feature-based pruning"""
+        return not param.startswith(self._pruned_prefixes) if self._pruned_prefixes else True
+
     def _create_configuration_space(self) -> ConfigurationSpace:
         """
-        Create SMAC configuration space from CVC5 parameters
+        Create SMAC configuration space from CVC5 parameters relevant to the
+        instance's theories
         """
         cs = ConfigurationSpace()
 
         # Add numeric parameters
         for param, info in self.param_mappings['int_params'].items():
             # Only add parameters with defined bounds
-            if info['min'] is not None and info['max'] is not None:
+            if info['min'] is not None and info['max'] is not None and self._is_relevant(param):
                 cs.add(
                     Integer(param, bounds = (info['min'], info['max']), default=info['default'])
                 )
 
-        # Add float parameters
+        # Add float parameters; thresholds/ratios with positive bounds are
+        # searched on a log scale, which the surrogate model handles with
+        # far fewer samples than a uniform continuous range
         for param, info in self.param_mappings['float_params'].items():
-            if info['min'] is not None and info['max'] is not None:
+            if info['min'] is not None and info['max'] is not None and self._is_relevant(param):
+                log_scale = info['min'] > 0 and info['default'] > 0
                 cs.add(
-                    Float(param, bounds = (info['min'], info['max']), default=info['default'])
+                    Float(param, bounds = (info['min'], info['max']), default=info['default'],
+                          log=log_scale)
                 )
 
         # Add categorical parameters (mode parameters)
         for param, modes in self.param_mappings['mode_params'].items():
-            if modes:  # Only add if we have valid modes
+            if modes and self._is_relevant(param):  # Only add if we have valid modes
                 cs.add(
                     Categorical(param, modes)
                 )
 
         # Add selected boolean parameters that might affect performance
-        important_bool_params = [
-            'produce-models',
-            'incremental',
-            'strings-exp',
-            'use-approx',
-            'simp-ite-compress',
-            'simplification'
-        ]
-        
-        for param in important_bool_params:
+        for param in IMPORTANT_BOOL_PARAMS:
             if param in self.param_mappings['bool_params']:
                 cs.add(
                     Categorical(param, [True, False], 
@@ -68,52 +134,269 @@ class CVC5Optimizer:
 
         return cs
 
-    def _run_cvc5(self, config: Configuration, seed: int = 0) -> float:
+    def _trial_timeout(self) -> float:
         """
-        Run CVC5 with given configuration and return execution time
-        
+        Effective timeout for the next trial under adaptive capping: a config
+        slower than capping_slack times the incumbent is aborted early
+        """
+        return min(float(self.timeout), self.capping_slack * self._incumbent_cost)
+
+    def _record_cost(self, elapsed: float) -> None:
+        """Update the incumbent cost after a successful trial"""
+        if elapsed < self._incumbent_cost:
+            self._incumbent_cost = elapsed
+
+    def _run_cvc5_in_process(self, config: Configuration, seed: int = 0) -> float:
+        """
+        Run CVC5 through the Python API with given configuration, avoiding the
+        fork/exec and solver cold-start cost of a subprocess per trial
+
         Args:
             config (Configuration): Parameter configuration to test
             seed (int): Random seed for reproducibility
         Returns:
             float: Execution time in seconds (or timeout value if failed)
         """
-        command = ['cvc5']
-        
-        # Add parameters based on their types
+        solver = Solver()
+
+        # Without an interrupt hook the timeout could not be enforced and a
+        # diverging configuration would hang forever; stick to the killable
+        # subprocess path in that case
+        interrupt = getattr(solver, 'interrupt', None)
+        if interrupt is None:
+            self.in_process = False
+            raise RuntimeError("solver exposes no interrupt(), "
+                               "timeout would be unenforceable")
+
+        missing = object()
         for param, value in config.items():
-            if param in self.param_mappings['bool_params']:
-                if value:  # Only add flag if True
-                    command.append(f'--{param}')
-            else:
-                command.extend([f'--{param}', str(value)])
+            # Setting an option to its default is a no-op; skip the call
+            if value == self._defaults.get(param, missing):
+                continue
+            try:
+                if param in self._bool_set:
+                    solver.set(param, bool(value))
+                else:
+                    solver.set(param, value)
+            except Exception as e:
+                # Running with a silently dropped option would credit this
+                # config with a cost it did not earn; let _run_cvc5 retry the
+                # exact configuration via the subprocess path instead
+                raise RuntimeError(
+                    f"could not set {param}={value}: {str(e)}") from e
+        solver.set('random-seed', seed)
 
-        # Add random seed
-        command.extend(['--random-seed', str(seed)])
+        # Interrupt the solver if it exceeds the (possibly capped) timeout
+        trial_timeout = self._trial_timeout()
+        timer = threading.Timer(trial_timeout, interrupt)
 
-        command.append(self.smt2_file)
+        # Parse the SMT2 file on the first trial only; subsequent trials
+        # assert the preparsed terms instead of re-lexing the file
+        if self._assertions is None:
+            self._assertions = parse_smt2_file(self.smt2_file)
 
+        start_time = time.perf_counter_ns()
         try:
-            start_time = time.time()
-            process = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
-                timeout=self.timeout
-            )
-            end_time = time.time()
-            
-            if process.returncode == 0:
-                return end_time - start_time
+            solver.add(self._assertions)
+            timer.start()
+            result = solver.check()
+        finally:
+            timer.cancel()
+        elapsed = (time.perf_counter_ns() - start_time) * 1e-9
+
+        if result in (sat, unsat) and elapsed < trial_timeout:
+            self._record_cost(elapsed)
+            return elapsed
+        return self.timeout
+
+    @staticmethod
+    def _config_key(config: Configuration, seed: int) -> int:
+        """
+        Hash key identifying a (configuration, seed) pair; floats are rounded
+        so near-duplicate proposals collapse onto one cache entry
+        """
+        items = tuple(
+            (param, round(value, 6) if isinstance(value, float) else value)
+            for param, value in sorted(config.items())
+        )
+        return hash((items, seed))
+
+    def _run_cvc5(self, config: Configuration, seed: int = 0) -> float:
+        """
+        Run CVC5 with given configuration and return execution time.
+        Identical (configuration, seed) pairs are only evaluated once
+
+        Args:
+            config (Configuration): Parameter configuration to test
+            seed (int): Random seed for reproducibility
+        Returns:
+            float: Execution time in seconds (or timeout value if failed)
+        """
+        key = self._config_key(config, seed)
+        cached = self._run_cache.get(key)
+        if cached is not None:
+            return cached
+
+        if self.in_process:
+            try:
+                cost = self._run_cvc5_in_process(config, seed)
+                self._run_cache[key] = cost
+                return cost
+            except Exception as e:
+                print(f"Warning: in-process run failed ({str(e)}), "
+                      f"falling back to subprocess")
+
+        cost = self._run_cvc5_subprocess(config, seed)
+        self._run_cache[key] = cost
+        return cost
+
+    def _build_command(self, config: Configuration, seed: int = 0) -> list:
+        """
+        Build the cvc5 command line for a configuration. The config-derived
+        argument list is cached by config hash, so repeated proposals of the
+        same configuration (e.g. under different seeds) skip the rebuild
+
+        Args:
+            config (Configuration): Parameter configuration to test
+            seed (int): Random seed for reproducibility
+        Returns:
+            list: Full cvc5 argv including seed and input file
+        """
+        key = hash(tuple(sorted(config.items())))
+        args = self._command_cache.get(key)
+        if args is None:
+            bool_set = self._bool_set
+            missing = object()
+            args = []
+            for param, value in config.items():
+                # Options left at their default are no-ops for cvc5; skip them
+                if value == self._defaults.get(param, missing):
+                    continue
+                if param in bool_set:
+                    if value:  # Only add flag if True
+                        args.append(f'--{param}')
+                else:
+                    # repr round-trips floats exactly; str is fine for the rest
+                    text = repr(value) if isinstance(value, float) else str(value)
+                    args.extend([f'--{param}', text])
+            self._command_cache[key] = args
+
+        return ['cvc5'] + args + ['--random-seed', str(seed), self.smt2_file]
+
+    def _run_cvc5_subprocess(self, config: Configuration, seed: int = 0) -> float:
+        """
+        Run CVC5 as a subprocess with given configuration and return
+        execution time
+
+        Args:
+            config (Configuration): Parameter configuration to test
+            seed (int): Random seed for reproducibility
+        Returns:
+            float: Execution time in seconds (or timeout value if failed)
+        """
+        command = self._build_command(config, seed)
+
+        try:
+            start_time = time.perf_counter_ns()
+            if self.portfolio:
+                # Race the candidate against default-configuration CVC5;
+                # the first finisher wins and the loser is killed
+                baseline = ['cvc5', '--random-seed', str(seed), self.smt2_file]
+                returncode = asyncio.run(
+                    self._race_portfolio([command, baseline], self._trial_timeout())
+                )
+            else:
+                returncode = asyncio.run(
+                    self._launch_cvc5(command, self._trial_timeout())
+                )
+            elapsed = (time.perf_counter_ns() - start_time) * 1e-9
+
+            if returncode == 0:
+                self._record_cost(elapsed)
+                return elapsed
             else:
                 return self.timeout
-                
-        except subprocess.TimeoutExpired:
+
+        except asyncio.TimeoutError:
             return self.timeout
         except Exception as e:
             print(f"Error running CVC5: {str(e)}")
             return self.timeout
 
+    @staticmethod
+    async def _launch_cvc5(command: list, timeout: float) -> int:
+        """
+        Launch a cvc5 process asynchronously and wait for it under a timeout,
+        killing it if the timeout expires
+
+        Args:
+            command (list): Full cvc5 argv
+            timeout (float): Seconds to wait before killing the process
+        Returns:
+            int: Process return code
+        """
+        # Only the return code and wall time are used, so solver output goes
+        # straight to the null device instead of through pipes into Python
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        try:
+            await asyncio.wait_for(process.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise
+        return process.returncode
+
+    @staticmethod
+    async def _race_portfolio(commands: list, timeout: float) -> int:
+        """
+        Launch several solver processes concurrently and return as soon as one
+        exits successfully, killing the others
+
+        Args:
+            commands (list): List of cvc5 argvs to race
+            timeout (float): Overall seconds before the whole race is aborted
+        Returns:
+            int: Return code of the winning process
+        """
+        processes = []
+        for command in commands:
+            processes.append(await asyncio.create_subprocess_exec(
+                *command,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL
+            ))
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        pending = {asyncio.ensure_future(p.wait()) for p in processes}
+        try:
+            winner = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=deadline - loop.time(),
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise asyncio.TimeoutError
+                for task in done:
+                    if task.result() == 0:
+                        return 0
+                    winner = task.result()
+            # Every process finished but none succeeded
+            return winner if winner is not None else 1
+        finally:
+            for task in pending:
+                task.cancel()
+            for process in processes:
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+
     def optimize(self, n_trials: int = 100, n_workers: int = 1) -> Dict[str, Any]:
         """
         Run SMAC optimization to find best parameters
@@ -134,18 +417,81 @@ class CVC5Optimizer:
             output_directory=Path("smac_output")
         )
 
-        # Create optimization facade
-        smac = HyperparameterOptimizationFacade(
-            scenario=scenario,
-            target_function=self._run_cvc5,
-            overwrite=True
+        # With multiple workers, evaluate trials on a Dask process pool whose
+        # workers are pre-warmed and pinned to distinct cores
+        dask_client = None
+        if n_workers > 1:
+            from dask.distributed import Client
+            dask_client = Client(n_workers=n_workers,
+                                 threads_per_worker=1,
+                                 processes=True)
+            for i, addr in enumerate(sorted(dask_client.scheduler_info()['workers'])):
+                dask_client.run(_warm_worker, i, workers=[addr])
+
+        # Seed the initial design with the default configuration, so the
+        # CVC5 defaults are always evaluated as a baseline
+        initial_design = HyperparameterOptimizationFacade.get_initial_design(
+            scenario,
+            additional_configs=[self.configspace.get_default_configuration()]
         )
 
-        # Run optimization
-        incumbent = smac.optimize()
-        
+        # SMAC only closes clients it creates itself, so ours must be closed
+        # here or every optimize() call leaks the scheduler and workers
+        try:
+            # Create optimization facade
+            smac = HyperparameterOptimizationFacade(
+                scenario=scenario,
+                target_function=self._run_cvc5,
+                initial_design=initial_design,
+                overwrite=True,
+                dask_client=dask_client
+            )
+
+            # Run optimization
+            incumbent = smac.optimize()
+
+            # Persist a compact columnar copy of the runhistory for analysis
+            try:
+                self._export_runhistory(smac, Path("smac_output"))
+            except Exception as e:
+                print(f"Warning: could not export runhistory: {str(e)}")
+        finally:
+            if dask_client is not None:
+                dask_client.close()
+
         return incumbent
 
+    @staticmethod
+    def _export_runhistory(smac, output_dir: Path) -> None:
+        """
+        Write the runhistory as a Parquet file (CSV if pyarrow is missing)
+        next to SMAC's JSON output; columnar storage keeps large histories
+        small and cheap to load for analysis
+
+        Args:
+            smac: The optimization facade after optimize() has run
+            output_dir (Path): Directory to write the export into
+        """
+        columns = {'config_id': [], 'seed': [], 'cost': [], 'time': [], 'status': []}
+        for trial_key, trial_value in smac.runhistory.items():
+            columns['config_id'].append(trial_key.config_id)
+            columns['seed'].append(trial_key.seed if trial_key.seed is not None else -1)
+            columns['cost'].append(float(trial_value.cost))
+            columns['time'].append(float(trial_value.time))
+            columns['status'].append(getattr(trial_value.status, 'value', trial_value.status))
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            pq.write_table(pa.table(columns), output_dir / "runhistory.parquet")
+        except ImportError:
+            import csv
+            with open(output_dir / "runhistory.csv", "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(columns.keys())
+                writer.writerows(zip(*columns.values()))
+
 def main():
     import argparse
     parser = argparse.ArgumentParser(description='Optimize CVC5 parameters using SMAC3')